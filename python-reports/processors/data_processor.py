@@ -5,10 +5,19 @@
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union
 from pathlib import Path
+from datetime import date, time
+import json
 import warnings
 
+from processors.engines import DataEngine, DuckDBEngine, as_engine
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 warnings.filterwarnings('ignore')
 
 
@@ -18,6 +27,21 @@ class DataProcessor:
     负责样本数据的读取、清洗、统计和质量分析
     """
     
+    # 格式一致性检查使用的正则表达式
+    FORMAT_PATTERNS = {
+        "email": r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$',
+        "phone": r'^\d{11}$|^\d{3}-\d{4}-\d{4}$',
+        "date": r'^\d{4}-\d{2}-\d{2}$'
+    }
+    
+    # 列式导出时各统计表的指标列
+    TABLE_METRICS = {
+        "numeric_stats": ["mean", "median", "std", "min", "max", "q1", "q3", "skewness", "kurtosis"],
+        "categorical_stats": ["unique_count", "top_value", "top_frequency"],
+        "completeness": ["null_count", "completeness_rate"],
+        "accuracy": ["negative_count", "zero_count", "outlier_count"]
+    }
+    
     def __init__(self):
         """初始化数据处理器"""
         self.supported_formats = ['.xlsx', '.csv', '.xls']
@@ -32,19 +56,8 @@ class DataProcessor:
         Returns:
             处理后的DataFrame
         """
-        file_path = Path(file_path)
-        
-        if not file_path.exists():
-            raise FileNotFoundError(f"文件不存在: {file_path}")
-        
-        if file_path.suffix.lower() not in self.supported_formats:
-            raise ValueError(f"不支持的文件格式: {file_path.suffix}")
-        
         # 读取数据
-        if file_path.suffix.lower() == '.csv':
-            df = pd.read_csv(file_path, encoding='utf-8')
-        else:
-            df = pd.read_excel(file_path)
+        df = self._read_file(file_path)
         
         # 数据清洗
         df = self._clean_data(df)
@@ -80,158 +93,237 @@ class DataProcessor:
         if len(df.columns) < 2:
             raise ValueError("数据列数过少")
     
-    def generate_statistics(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def profile_file(self,
+                     file_path: str,
+                     engine: str = "duckdb",
+                     clean: bool = True,
+                     **engine_options) -> Dict[str, Any]:
+        """
+        直接对本地文件生成统计数据
+        
+        使用 duckdb 引擎时所有聚合在 DuckDB 中执行，数据不会加载到 pandas，
+        适用于内存放不下的大文件
+        
+        Args:
+            file_path: 文件路径
+            engine: 计算引擎，'duckdb' 或 'pandas'
+            clean: 是否执行与 process_sample_file 相同的数据清洗
+            **engine_options: 传给 DuckDBEngine 的参数，如 threads、memory_limit
+            
+        Returns:
+            统计数据字典
+        """
+        if engine == "pandas":
+            if clean:
+                return self.generate_statistics(self.process_sample_file(file_path))
+            return self.generate_statistics(self._read_file(file_path))
+        
+        if engine != "duckdb":
+            raise ValueError(f"不支持的计算引擎: {engine}")
+        
+        data_engine = DuckDBEngine(file_path, **engine_options)
+        if clean:
+            data_engine = self._clean_engine(data_engine)
+            self._validate_engine(data_engine)
+        
+        return self.generate_statistics(data_engine)
+    
+    def _read_file(self, file_path: str) -> pd.DataFrame:
+        """读取文件，不做清洗"""
+        file_path = Path(file_path)
+        
+        if not file_path.exists():
+            raise FileNotFoundError(f"文件不存在: {file_path}")
+        
+        if file_path.suffix.lower() not in self.supported_formats:
+            raise ValueError(f"不支持的文件格式: {file_path.suffix}")
+        
+        if file_path.suffix.lower() == '.csv':
+            return pd.read_csv(file_path, encoding='utf-8')
+        return pd.read_excel(file_path)
+    
+    def _clean_engine(self, engine: DataEngine) -> DataEngine:
+        """按 _clean_data 的规则在引擎中清洗数据"""
+        total_rows = engine.row_count()
+        threshold = total_rows * 0.7
+        null_counts = engine.null_counts()
+        
+        # 删除空值较多的列
+        columns = [col for col in engine.columns() if total_rows - null_counts[col] >= threshold]
+        
+        # 填充缺失值
+        numeric_cols = set(engine.numeric_columns())
+        categorical_cols = set(engine.categorical_columns())
+        fill_values = {}
+        for col in columns:
+            if col in numeric_cols:
+                fill_values[col] = 0
+            elif col in categorical_cols:
+                fill_values[col] = ''
+        
+        # 去除重复行
+        return engine.prepare(columns, fill_values, distinct=True)
+    
+    def _validate_engine(self, engine: DataEngine):
+        """引擎数据验证"""
+        if engine.row_count() == 0 or len(engine.columns()) == 0:
+            raise ValueError("数据为空")
+        
+        if len(engine.columns()) < 2:
+            raise ValueError("数据列数过少")
+    
+    def generate_statistics(self, df: Union[pd.DataFrame, DataEngine]) -> Dict[str, Any]:
         """
         生成统计数据
         
         Args:
-            df: 处理后的DataFrame
+            df: 处理后的DataFrame，或数据引擎
             
         Returns:
             统计数据字典
         """
+        engine = as_engine(df)
+        numeric_stats = self._get_numeric_stats(engine)
+        
         stats = {
-            "basic_info": self._get_basic_info(df),
-            "numeric_stats": self._get_numeric_stats(df),
-            "categorical_stats": self._get_categorical_stats(df),
-            "quality_metrics": self._get_quality_metrics(df),
-            "sample_data": self._get_sample_data(df)
+            "basic_info": self._get_basic_info(engine),
+            "numeric_stats": numeric_stats,
+            "categorical_stats": self._get_categorical_stats(engine),
+            "quality_metrics": self._get_quality_metrics(engine, numeric_stats),
+            "sample_data": self._get_sample_data(engine)
         }
         
         return stats
     
-    def _get_basic_info(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _get_basic_info(self, engine: DataEngine) -> Dict[str, Any]:
         """获取基础信息"""
         return {
-            "total_rows": len(df),
-            "total_columns": len(df.columns),
-            "memory_usage": df.memory_usage(deep=True).sum(),
-            "data_types": df.dtypes.to_dict()
+            "total_rows": engine.row_count(),
+            "total_columns": len(engine.columns()),
+            "memory_usage": engine.memory_usage(),
+            "data_types": engine.dtypes()
         }
     
-    def _get_numeric_stats(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _get_numeric_stats(self, engine: DataEngine) -> Dict[str, Any]:
         """获取数值统计"""
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        numeric_cols = engine.numeric_columns()
         
         if len(numeric_cols) == 0:
             return {}
         
         stats = {}
-        for col in numeric_cols:
-            stats[col] = {
-                "mean": float(df[col].mean()),
-                "median": float(df[col].median()),
-                "std": float(df[col].std()),
-                "min": float(df[col].min()),
-                "max": float(df[col].max()),
-                "q1": float(df[col].quantile(0.25)),
-                "q3": float(df[col].quantile(0.75)),
-                "skewness": float(df[col].skew()),
-                "kurtosis": float(df[col].kurtosis())
-            }
+        for col, summary in engine.numeric_summary(numeric_cols).items():
+            stats[col] = {metric: float(value) for metric, value in summary.items()}
         
         return stats
     
-    def _get_categorical_stats(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _get_categorical_stats(self, engine: DataEngine) -> Dict[str, Any]:
         """获取分类统计"""
-        categorical_cols = df.select_dtypes(include=['object']).columns
+        categorical_cols = engine.categorical_columns()
         
         if len(categorical_cols) == 0:
             return {}
         
+        unique_counts = engine.nunique(categorical_cols)
+        
         stats = {}
         for col in categorical_cols:
-            value_counts = df[col].value_counts()
+            value_counts = engine.value_counts(col, top=10)
             stats[col] = {
-                "unique_count": int(df[col].nunique()),
+                "unique_count": unique_counts[col],
                 "top_value": str(value_counts.index[0]) if len(value_counts) > 0 else None,
                 "top_frequency": int(value_counts.iloc[0]) if len(value_counts) > 0 else 0,
-                "value_distribution": value_counts.head(10).to_dict()
+                "value_distribution": value_counts.to_dict()
             }
         
         return stats
     
-    def _get_quality_metrics(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """获取数据质量指标"""
+    def _get_quality_metrics(self,
+                             engine: DataEngine,
+                             numeric_stats: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        获取数据质量指标
+        
+        Args:
+            engine: 数据引擎
+            numeric_stats: 已计算的数值统计，异常值上下界直接使用其中的四分位数
+        """
         quality = {
             "completeness": {},
             "consistency": {},
             "accuracy": {}
         }
         
+        total_rows = engine.row_count()
+        
         # 完整性
-        for col in df.columns:
-            null_count = df[col].isnull().sum()
-            completeness = 1 - (null_count / len(df))
+        for col, null_count in engine.null_counts().items():
+            completeness = 1 - (null_count / total_rows)
             quality["completeness"][col] = {
                 "null_count": int(null_count),
                 "completeness_rate": float(completeness)
             }
         
-        # 一致性检查
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                # 检查格式一致性
-                format_consistency = self._check_format_consistency(df[col])
-                quality["consistency"][col] = format_consistency
+        # 一致性检查（检查格式一致性）
+        quality["consistency"] = self._check_format_consistency(engine, engine.categorical_columns())
         
         # 准确性检查
-        quality["accuracy"] = self._check_data_accuracy(df)
+        if numeric_stats is None:
+            numeric_stats = self._get_numeric_stats(engine)
+        quality["accuracy"] = self._check_data_accuracy(engine, numeric_stats)
         
         return quality
     
-    def _check_format_consistency(self, series: pd.Series) -> Dict[str, Any]:
-        """检查格式一致性"""
-        # 简单的格式检查示例
-        patterns = {
-            "email": r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$',
-            "phone": r'^\d{11}$|^\d{3}-\d{4}-\d{4}$',
-            "date": r'^\d{4}-\d{2}-\d{2}$'
-        }
+    def _check_format_consistency(self, engine: DataEngine, columns: List[str]) -> Dict[str, Any]:
+        """检查格式一致性，所有列的匹配计数一次完成"""
+        total_count = engine.row_count()
+        match_counts = engine.pattern_match_counts({col: self.FORMAT_PATTERNS for col in columns})
         
         results = {}
-        for pattern_name, pattern in patterns.items():
-            matches = series.astype(str).str.match(pattern, na=False)
-            results[pattern_name] = {
-                "match_rate": float(matches.sum() / len(series)),
-                "match_count": int(matches.sum()),
-                "total_count": int(len(series))
-            }
+        for col, counts in match_counts.items():
+            results[col] = {}
+            for pattern_name, match_count in counts.items():
+                results[col][pattern_name] = {
+                    "match_rate": float(match_count / total_count),
+                    "match_count": int(match_count),
+                    "total_count": int(total_count)
+                }
         
         return results
     
-    def _check_data_accuracy(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _check_data_accuracy(self, engine: DataEngine, numeric_stats: Dict[str, Any]) -> Dict[str, Any]:
         """检查数据准确性"""
-        accuracy = {}
-        
         # 数值范围检查
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        for col in numeric_cols:
-            values = df[col]
-            accuracy[col] = {
-                "negative_count": int((values < 0).sum()),
-                "zero_count": int((values == 0).sum()),
-                "outlier_count": int(self._detect_outliers(values))
-            }
+        if len(numeric_stats) == 0:
+            return {}
         
-        return accuracy
+        return engine.accuracy_counts(self._outlier_bounds(numeric_stats))
     
-    def _detect_outliers(self, series: pd.Series) -> int:
-        """检测异常值"""
-        q1 = series.quantile(0.25)
-        q3 = series.quantile(0.75)
-        iqr = q3 - q1
-        lower_bound = q1 - 1.5 * iqr
-        upper_bound = q3 + 1.5 * iqr
-        
-        return int(((series < lower_bound) | (series > upper_bound)).sum())
+    def _outlier_bounds(self, numeric_stats: Dict[str, Any]) -> Dict[str, Any]:
+        """按 IQR 规则由数值统计中的四分位数计算异常值上下界"""
+        bounds = {}
+        for col, stats in numeric_stats.items():
+            q1 = stats["q1"]
+            q3 = stats["q3"]
+            iqr = q3 - q1
+            bounds[col] = (q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+        
+        return bounds
     
-    def _get_sample_data(self, df: pd.DataFrame, n: int = 10) -> Dict[str, Any]:
+    def _get_sample_data(self, engine: DataEngine, n: int = 10) -> Dict[str, Any]:
         """获取样本数据"""
+        head = engine.head(n)
+        tail = engine.tail(n)
+        random = engine.sample(n)
+        
+        # 合并后只做一次记录转换
+        records = pd.concat([head, tail, random]).to_dict("records")
+        split = [len(head), len(head) + len(tail)]
+        
         return {
-            "head": df.head(n).to_dict("records"),
-            "tail": df.tail(n).to_dict("records"),
-            "random": df.sample(min(n, len(df))).to_dict("records")
+            "head": records[:split[0]],
+            "tail": records[split[0]:split[1]],
+            "random": records[split[1]:]
         }
     
     def get_data_summary(self, df: pd.DataFrame) -> Dict[str, Any]:
@@ -260,4 +352,178 @@ class DataProcessor:
             }
         }
         
-        return summary
\ No newline at end of file
+        return summary
+    
+    def statistics_to_tables(self, stats: Dict[str, Any]) -> Dict[str, pd.DataFrame]:
+        """
+        将统计数据转换为列式表格
+        
+        每个部分转换为一张 列 × 指标 的表，便于写入 Arrow/Parquet
+        
+        Args:
+            stats: generate_statistics 返回的统计数据
+            
+        Returns:
+            表名到DataFrame的字典
+        """
+        basic_info = stats["basic_info"]
+        quality = stats["quality_metrics"]
+        
+        tables = {
+            "basic_info": pd.DataFrame([{
+                "total_rows": int(basic_info["total_rows"]),
+                "total_columns": int(basic_info["total_columns"]),
+                "memory_usage": int(basic_info["memory_usage"])
+            }]),
+            "data_types": pd.DataFrame({
+                "column": [str(col) for col in basic_info["data_types"]],
+                "dtype": [str(dtype) for dtype in basic_info["data_types"].values()]
+            }),
+            "numeric_stats": self._metrics_table(stats["numeric_stats"], self.TABLE_METRICS["numeric_stats"]),
+            "categorical_stats": self._metrics_table({
+                col: {key: value for key, value in item.items() if key != "value_distribution"}
+                for col, item in stats["categorical_stats"].items()
+            }, self.TABLE_METRICS["categorical_stats"]),
+            "categorical_distribution": pd.DataFrame(
+                [
+                    {"column": str(col), "value": str(value), "count": int(count)}
+                    for col, item in stats["categorical_stats"].items()
+                    for value, count in item["value_distribution"].items()
+                ],
+                columns=["column", "value", "count"]
+            ),
+            "completeness": self._metrics_table(quality["completeness"], self.TABLE_METRICS["completeness"]),
+            "consistency": pd.DataFrame(
+                [
+                    {"column": str(col), "pattern": pattern, **result}
+                    for col, patterns in quality["consistency"].items()
+                    for pattern, result in patterns.items()
+                ],
+                columns=["column", "pattern", "match_rate", "match_count", "total_count"]
+            ),
+            "accuracy": self._metrics_table(quality["accuracy"], self.TABLE_METRICS["accuracy"]),
+            "sample_data": self._sample_table(stats["sample_data"])
+        }
+        
+        return tables
+    
+    def save_statistics_tables(self,
+                               stats: Dict[str, Any],
+                               output_dir: str,
+                               file_format: str = "parquet") -> Dict[str, str]:
+        """
+        将统计数据按部分保存为列式文件
+        
+        Args:
+            stats: generate_statistics 返回的统计数据
+            output_dir: 输出目录
+            file_format: 文件格式，'parquet' 或 'feather'（Arrow IPC，可内存映射零拷贝读取）
+            
+        Returns:
+            表名到文件路径的字典
+        """
+        if file_format not in ["parquet", "feather"]:
+            raise ValueError(f"不支持的导出格式: {file_format}")
+        
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        paths = {}
+        for name, table in self.statistics_to_tables(stats).items():
+            path = output_dir / f"{name}.{file_format}"
+            if file_format == "parquet":
+                table.to_parquet(path, index=False)
+            else:
+                table.to_feather(path)
+            paths[name] = str(path)
+        
+        return paths
+    
+    def statistics_to_json(self, stats: Dict[str, Any]) -> bytes:
+        """
+        将统计数据序列化为JSON
+        
+        安装 orjson 时直接序列化 numpy 类型，否则回退到标准库 json
+        
+        Args:
+            stats: generate_statistics 返回的统计数据
+            
+        Returns:
+            UTF-8 编码的JSON字节串
+        """
+        if orjson is not None:
+            option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            try:
+                return orjson.dumps(stats, default=self._json_default, option=option)
+            except TypeError:
+                # orjson 不支持 numpy 标量、Timestamp 等字典键，先统一转换
+                return orjson.dumps(self._to_builtin(stats), default=self._json_default, option=option)
+        
+        return json.dumps(self._to_builtin(stats), ensure_ascii=False).encode("utf-8")
+    
+    def _metrics_table(self, section: Dict[str, Dict[str, Any]], metrics: List[str]) -> pd.DataFrame:
+        """将 {列名: {指标: 值}} 转换为 列 × 指标 表，没有变量时也保留指标列"""
+        table = pd.DataFrame.from_dict(section, orient="index", columns=metrics)
+        table.index = table.index.map(str)
+        return table.rename_axis("column").reset_index()
+    
+    def _sample_table(self, sample_data: Dict[str, List[Dict[str, Any]]]) -> pd.DataFrame:
+        """将样本数据合并为一张表，sample 列标识来源"""
+        frames = [
+            pd.DataFrame(records).assign(sample=name)
+            for name, records in sample_data.items()
+            if records
+        ]
+        if not frames:
+            return pd.DataFrame(columns=["sample"])
+        
+        table = pd.concat(frames, ignore_index=True)
+        table.columns = table.columns.map(str)
+        
+        # 混合类型的对象列统一转为字符串，保证可写入 Arrow
+        for col in table.select_dtypes(include=["object"]).columns:
+            table[col] = table[col].astype("string")
+        
+        return table
+    
+    def _json_default(self, obj: Any) -> Any:
+        """处理 orjson 无法直接序列化的对象"""
+        if obj is pd.NA or obj is pd.NaT:
+            return None
+        if isinstance(obj, np.dtype) or isinstance(obj, pd.api.extensions.ExtensionDtype):
+            return str(obj)
+        if isinstance(obj, (pd.Timestamp, pd.Timedelta, date, time)):
+            return obj.isoformat()
+        if isinstance(obj, np.generic):
+            return obj.item()
+        return str(obj)
+    
+    def _json_key(self, key: Any) -> str:
+        """转换字典键，格式与 orjson 的 OPT_NON_STR_KEYS 一致"""
+        if isinstance(key, np.generic):
+            key = key.item()
+        if isinstance(key, str):
+            return key
+        if key is None:
+            return "null"
+        if isinstance(key, bool):
+            return "true" if key else "false"
+        if isinstance(key, (int, float)):
+            return str(key)
+        return str(self._json_default(key))
+    
+    def _to_builtin(self, obj: Any) -> Any:
+        """递归转换为标准库 json 可序列化的对象"""
+        if isinstance(obj, dict):
+            return {self._json_key(key): self._to_builtin(value) for key, value in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            return [self._to_builtin(value) for value in obj]
+        if isinstance(obj, np.ndarray):
+            return self._to_builtin(obj.tolist())
+        if isinstance(obj, np.generic):
+            obj = obj.item()
+        if isinstance(obj, float):
+            return obj if np.isfinite(obj) else None
+        if obj is None or isinstance(obj, (str, int, bool)):
+            return obj
+        return self._json_default(obj)
@@ -0,0 +1,320 @@
+"""
+密度计算引擎模块
+负责数值变量的直方图分箱和核密度估计，供分布类图表和数据导出共用
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, List, Optional, Tuple, Union
+from collections import OrderedDict
+
+
+class DensityEngine:
+    """
+    密度计算引擎类
+    对数值列分批完成向量化直方图分箱和基于FFT的分箱核密度估计，
+    只计算图表实际用到的列，结果按数据指纹缓存，缓存总大小按字节数限制
+    """
+    
+    BANDWIDTH_METHODS = ['scott', 'silverman']
+    
+    def __init__(self,
+                 bins: int = 30,
+                 gridsize: int = 512,
+                 max_gridsize: int = 16384,
+                 bw_method: Union[str, float] = 'scott',
+                 bw_adjust: float = 1.0,
+                 cut: float = 3.0,
+                 chunk_size: int = 16,
+                 max_cache_bytes: int = 64 * 1024 * 1024):
+        """
+        初始化密度计算引擎
+        
+        Args:
+            bins: 直方图分箱数
+            gridsize: 核密度估计网格点数
+            max_gridsize: 带宽过小时网格可加密到的最大点数
+            bw_method: 带宽规则，'scott'、'silverman' 或带宽系数（与标准差相乘，同 scipy）
+            bw_adjust: 带宽缩放系数
+            cut: 核密度曲线向数据范围两侧延伸的带宽倍数
+            chunk_size: 每批计算的列数，限制宽表计算时的峰值内存
+            max_cache_bytes: 缓存结果占用的最大字节数
+        """
+        if isinstance(bw_method, str) and bw_method not in self.BANDWIDTH_METHODS:
+            raise ValueError(f"不支持的带宽规则: {bw_method}")
+        
+        self.bins = bins
+        self.gridsize = gridsize
+        self.max_gridsize = max(max_gridsize, gridsize)
+        self.bw_method = bw_method
+        self.bw_adjust = bw_adjust
+        self.cut = cut
+        self.chunk_size = max(int(chunk_size), 1)
+        self.max_cache_bytes = max_cache_bytes
+        self._cache: "OrderedDict[Tuple, Tuple[Dict[str, Dict[str, Any]], int]]" = OrderedDict()
+        self._cache_bytes = 0
+    
+    def compute(self,
+                df: pd.DataFrame,
+                columns: Optional[List[str]] = None,
+                kde: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        计算数值列的分箱和密度
+        
+        Args:
+            df: 数据DataFrame
+            columns: 需要计算的列，默认为全部数值列（非数值列会被忽略）
+            kde: 是否计算核密度曲线，只画直方图时可关闭
+        
+        Returns:
+            以列名为键的密度结果字典，每列包含:
+            bin_edges, counts, density, kde_x, kde_y, bandwidth, count
+            （未计算或无法估计核密度的列 kde_x/kde_y/bandwidth 为 None；全为缺失值的列不包含在结果中）
+        """
+        numeric_df = df.select_dtypes(include=[np.number])
+        if columns is not None:
+            numeric_df = numeric_df[[col for col in columns if col in numeric_df.columns]]
+        if numeric_df.empty:
+            return {}
+        
+        key = self._cache_key(numeric_df, kde)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key][0]
+        
+        # 按列分批计算，峰值内存只与单批列数有关
+        result = {}
+        for start in range(0, numeric_df.shape[1], self.chunk_size):
+            chunk = numeric_df.iloc[:, start:start + self.chunk_size]
+            result.update(self._compute_chunk(chunk, kde))
+        
+        self._store(key, result)
+        
+        return result
+    
+    def _compute_chunk(self, numeric_df: pd.DataFrame, kde: bool) -> Dict[str, Dict[str, Any]]:
+        """计算一批数值列的分箱和密度"""
+        values = numeric_df.to_numpy(dtype=float, na_value=np.nan)
+        valid = np.isfinite(values)
+        counts = valid.sum(axis=0)
+        
+        keep = counts > 0
+        columns = list(numeric_df.columns[keep])
+        if not columns:
+            return {}
+        
+        values, valid, counts = values[:, keep], valid[:, keep], counts[keep]
+        histograms = self._histogram(values, valid, counts)
+        if kde:
+            kdes = self._kde(values, valid, counts)
+        else:
+            kdes = [{"kde_x": None, "kde_y": None, "bandwidth": None} for _ in columns]
+        
+        return {
+            col: {**histograms[i], **kdes[i], "count": int(counts[i])}
+            for i, col in enumerate(columns)
+        }
+    
+    def _store(self, key: Tuple, result: Dict[str, Dict[str, Any]]):
+        """写入缓存，超出字节上限时淘汰最久未使用的结果"""
+        size = sum(
+            value.nbytes
+            for item in result.values()
+            for value in item.values()
+            if isinstance(value, np.ndarray)
+        )
+        if size > self.max_cache_bytes:
+            return
+        
+        self._cache[key] = (result, size)
+        self._cache_bytes += size
+        while self._cache_bytes > self.max_cache_bytes:
+            _, (_, evicted) = self._cache.popitem(last=False)
+            self._cache_bytes -= evicted
+    
+    def export_densities(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        导出密度数据（可直接JSON序列化）
+        
+        Args:
+            df: 数据DataFrame
+        
+        Returns:
+            以列名为键的分箱和密度数据字典
+        """
+        densities = self.compute(df)
+        
+        export = {}
+        for col, item in densities.items():
+            export[str(col)] = {
+                key: (value.tolist() if isinstance(value, np.ndarray) else value)
+                for key, value in item.items()
+            }
+        
+        return {
+            "settings": self.settings(),
+            "columns": export
+        }
+    
+    def settings(self) -> Dict[str, Any]:
+        """获取计算参数，可用于创建相同配置的引擎"""
+        return {
+            "bins": self.bins,
+            "gridsize": self.gridsize,
+            "max_gridsize": self.max_gridsize,
+            "bw_method": self.bw_method,
+            "bw_adjust": self.bw_adjust,
+            "cut": self.cut
+        }
+    
+    def clear_cache(self):
+        """清空密度缓存"""
+        self._cache.clear()
+        self._cache_bytes = 0
+    
+    def _cache_key(self, numeric_df: pd.DataFrame, kde: bool) -> Tuple:
+        """根据数据内容和计算参数生成缓存键"""
+        fingerprint = int(pd.util.hash_pandas_object(numeric_df, index=False).sum())
+        return (
+            tuple(numeric_df.columns),
+            numeric_df.shape,
+            fingerprint,
+            kde,
+            self.bins,
+            self.gridsize,
+            self.max_gridsize,
+            self.bw_method,
+            self.bw_adjust,
+            self.cut
+        )
+    
+    def _histogram(self, values: np.ndarray, valid: np.ndarray, counts: np.ndarray) -> List[Dict[str, Any]]:
+        """向量化多列直方图，分箱规则与 np.histogram 一致"""
+        n_vars = values.shape[1]
+        
+        lower = np.nanmin(np.where(valid, values, np.nan), axis=0)
+        upper = np.nanmax(np.where(valid, values, np.nan), axis=0)
+        
+        # 常数列按 np.histogram 的方式扩展区间
+        constant = lower == upper
+        lower = np.where(constant, lower - 0.5, lower)
+        upper = np.where(constant, upper + 0.5, upper)
+        width = upper - lower
+        
+        index = np.floor((values - lower) / width * self.bins)
+        index = np.clip(np.nan_to_num(index), 0, self.bins - 1).astype(np.int64)
+        index += np.arange(n_vars) * self.bins
+        
+        bin_counts = np.bincount(index[valid], minlength=n_vars * self.bins)
+        bin_counts = bin_counts.reshape(n_vars, self.bins)
+        
+        bin_edges = lower[:, None] + width[:, None] * np.linspace(0, 1, self.bins + 1)
+        bin_width = (width / self.bins)[:, None]
+        density = bin_counts / (counts[:, None] * bin_width)
+        
+        return [
+            {"bin_edges": bin_edges[i], "counts": bin_counts[i], "density": density[i]}
+            for i in range(n_vars)
+        ]
+    
+    def _bandwidth(self, values: np.ndarray, valid: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """按带宽规则计算各列带宽（与 scipy.stats.gaussian_kde 的定义一致）"""
+        masked = np.where(valid, values, np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.nanstd(masked, axis=0, ddof=1)
+        
+        if self.bw_method == 'scott':
+            factor = counts ** (-1 / 5)
+        elif self.bw_method == 'silverman':
+            factor = (counts * 3 / 4) ** (-1 / 5)
+        else:
+            factor = np.full(len(counts), float(self.bw_method))
+        
+        return std * factor * self.bw_adjust
+    
+    def _kde(self, values: np.ndarray, valid: np.ndarray, counts: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        基于FFT的分箱高斯核密度估计
+        
+        先将样本线性分箱到等距网格，再在频域与高斯核做卷积，
+        复杂度为 O(n + gridsize·log(gridsize))，与样本量和网格大小的乘积无关。
+        带宽相对数据范围过小（偏态或含极端值）时自动加密网格，
+        使网格步长不超过带宽的 1/4，最多加密到 max_gridsize
+        """
+        n_vars = values.shape[1]
+        bandwidth = self._bandwidth(values, valid, counts)
+        estimable = (counts > 1) & np.isfinite(bandwidth) & (bandwidth > 0)
+        
+        empty = {"kde_x": None, "kde_y": None, "bandwidth": None}
+        results = [dict(empty) for _ in range(n_vars)]
+        if not estimable.any():
+            return results
+        
+        h = np.where(estimable, bandwidth, 1.0)
+        masked = np.where(valid, values, np.nan)
+        lower = np.nanmin(masked, axis=0) - self.cut * h
+        upper = np.nanmax(masked, axis=0) + self.cut * h
+        
+        # 按所需网格点数分组，每组内仍是多列向量化计算
+        required = np.ceil((upper - lower) / (h / 4)) + 1
+        grids = np.where(
+            required <= self.gridsize,
+            self.gridsize,
+            np.minimum(2 ** np.ceil(np.log2(np.maximum(required, 1))), self.max_gridsize)
+        ).astype(np.int64)
+        grids = np.maximum(grids, self.gridsize)
+        
+        for grid in np.unique(grids[estimable]):
+            index = np.flatnonzero(estimable & (grids == grid))
+            kde_x, kde_y = self._binned_kde(
+                values[:, index], valid[:, index], counts[index], h[index], lower[index], upper[index], int(grid)
+            )
+            for i, col in enumerate(index):
+                results[col] = {"kde_x": kde_x[i], "kde_y": kde_y[i], "bandwidth": float(bandwidth[col])}
+        
+        return results
+    
+    def _binned_kde(self,
+                    values: np.ndarray,
+                    valid: np.ndarray,
+                    counts: np.ndarray,
+                    h: np.ndarray,
+                    lower: np.ndarray,
+                    upper: np.ndarray,
+                    grid: int) -> Tuple[np.ndarray, np.ndarray]:
+        """在相同网格点数下计算多列的分箱核密度"""
+        n_vars = values.shape[1]
+        step = (upper - lower) / (grid - 1)
+        
+        # 线性分箱：每个样本按距离分配到相邻两个网格点
+        position = np.nan_to_num((values - lower) / step)
+        left = np.clip(np.floor(position), 0, grid - 2).astype(np.int64)
+        right_weight = np.clip(position - left, 0, 1)
+        offset = np.arange(n_vars) * grid
+        
+        weights = np.bincount(
+            np.concatenate([(left + offset)[valid], (left + 1 + offset)[valid]]),
+            weights=np.concatenate([(1 - right_weight)[valid], right_weight[valid]]),
+            minlength=n_vars * grid
+        ).reshape(n_vars, grid) / counts[:, None]
+        
+        # 频域卷积，补零长度不小于 2·gridsize 以避免循环混叠
+        size = 1 << int(np.ceil(np.log2(2 * grid)))
+        lag = np.arange(size)
+        lag = np.where(lag < size // 2, lag, lag - size)
+        kernel = np.exp(-0.5 * (lag[None, :] * step[:, None] / h[:, None]) ** 2)
+        kernel[:, np.abs(lag) >= grid] = 0
+        
+        # 按离散核的总和归一化，保证曲线积分为1
+        kernel /= kernel.sum(axis=1, keepdims=True) * step[:, None]
+        
+        smoothed = np.fft.irfft(
+            np.fft.rfft(weights, n=size, axis=1) * np.fft.rfft(kernel, axis=1),
+            n=size,
+            axis=1
+        )[:, :grid]
+        smoothed = np.clip(smoothed, 0, None)
+        
+        kde_x = lower[:, None] + step[:, None] * np.arange(grid)
+        
+        return kde_x, smoothed
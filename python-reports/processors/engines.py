@@ -0,0 +1,606 @@
+"""
+数据引擎模块
+将统计和图表所需的数据操作抽象为统一接口，支持内存 pandas 和基于 DuckDB 的外存计算
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, List, Optional, Tuple, Union
+from pathlib import Path
+from abc import ABC, abstractmethod
+import itertools
+import uuid
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+
+class DataEngine(ABC):
+    """
+    数据引擎基类
+    定义 DataProcessor 和 ChartGenerator 使用的数据操作，所有聚合结果均为小规模 Python/pandas 对象；
+    新的后端必须实现全部抽象方法，否则在创建时即报错
+    """
+    
+    @abstractmethod
+    def columns(self) -> List[str]:
+        """获取全部列名"""
+    
+    @abstractmethod
+    def dtypes(self) -> Dict[str, Any]:
+        """获取列类型"""
+    
+    @abstractmethod
+    def row_count(self) -> int:
+        """获取行数"""
+    
+    @abstractmethod
+    def memory_usage(self) -> int:
+        """获取数据占用字节数"""
+    
+    @abstractmethod
+    def numeric_columns(self) -> List[str]:
+        """获取数值列"""
+    
+    @abstractmethod
+    def categorical_columns(self) -> List[str]:
+        """获取分类（文本）列"""
+    
+    @abstractmethod
+    def null_counts(self, columns: Optional[List[str]] = None) -> Dict[str, int]:
+        """获取各列缺失值数量"""
+    
+    @abstractmethod
+    def nunique(self, columns: List[str]) -> Dict[str, int]:
+        """获取各列去重计数（不含缺失值）"""
+    
+    @abstractmethod
+    def quantiles(self, columns: List[str], q: List[float]) -> pd.DataFrame:
+        """获取分位数，行为分位点，列为变量"""
+    
+    @abstractmethod
+    def numeric_summary(self, columns: List[str]) -> Dict[str, Dict[str, float]]:
+        """获取数值列的 mean/median/std/min/max/q1/q3/skewness/kurtosis"""
+    
+    @abstractmethod
+    def value_counts(self, column: str, top: Optional[int] = None) -> pd.Series:
+        """获取取值频数，按频数降序"""
+    
+    @abstractmethod
+    def accuracy_counts(self, bounds: Dict[str, Tuple[float, float]]) -> Dict[str, Dict[str, int]]:
+        """按给定上下界统计负值、零值和越界值数量"""
+    
+    @abstractmethod
+    def pattern_match_counts(self, patterns: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, int]]:
+        """
+        统计列值（转为字符串后）匹配各正则表达式的数量
+        
+        Args:
+            patterns: 列名到 {规则名: 正则表达式} 的字典
+        
+        Returns:
+            列名到 {规则名: 匹配数量} 的字典
+        """
+    
+    @abstractmethod
+    def corr(self, columns: List[str]) -> pd.DataFrame:
+        """获取皮尔逊相关系数矩阵"""
+    
+    @abstractmethod
+    def crosstab(self, index: str, columns: str) -> pd.DataFrame:
+        """获取两个分类列的交叉频数表"""
+    
+    @abstractmethod
+    def head(self, n: int) -> pd.DataFrame:
+        """获取前 n 行"""
+    
+    @abstractmethod
+    def tail(self, n: int) -> pd.DataFrame:
+        """获取后 n 行"""
+    
+    @abstractmethod
+    def sample(self, n: int, seed: Optional[int] = None, ordered: bool = False) -> pd.DataFrame:
+        """
+        从全部数据中均匀随机抽取最多 n 行
+        
+        Args:
+            n: 抽样行数
+            seed: 随机种子
+            ordered: 是否按原始行序返回，供依赖行序的图表使用
+        """
+    
+    @abstractmethod
+    def prepare(self,
+                columns: List[str],
+                fill_values: Dict[str, Any],
+                distinct: bool = False) -> "DataEngine":
+        """
+        选择列、填充缺失值并可选去重，返回新的引擎
+        
+        Args:
+            columns: 保留的列
+            fill_values: 列名到填充值的字典
+            distinct: 是否去除重复行
+        """
+
+
+class PandasEngine(DataEngine):
+    """
+    pandas 内存引擎
+    与原有 DataFrame 计算方式保持一致
+    """
+    
+    def __init__(self, df: pd.DataFrame):
+        """初始化 pandas 引擎"""
+        self.df = df
+    
+    def columns(self) -> List[str]:
+        return list(self.df.columns)
+    
+    def dtypes(self) -> Dict[str, Any]:
+        return self.df.dtypes.to_dict()
+    
+    def row_count(self) -> int:
+        return len(self.df)
+    
+    def memory_usage(self) -> int:
+        return self.df.memory_usage(deep=True).sum()
+    
+    def numeric_columns(self) -> List[str]:
+        return list(self.df.select_dtypes(include=[np.number]).columns)
+    
+    def categorical_columns(self) -> List[str]:
+        return list(self.df.select_dtypes(include=['object']).columns)
+    
+    def null_counts(self, columns: Optional[List[str]] = None) -> Dict[str, int]:
+        columns = self.columns() if columns is None else columns
+        return {col: int(self.df[col].isnull().sum()) for col in columns}
+    
+    def nunique(self, columns: List[str]) -> Dict[str, int]:
+        return {col: int(self.df[col].nunique()) for col in columns}
+    
+    def quantiles(self, columns: List[str], q: List[float]) -> pd.DataFrame:
+        return self.df[columns].quantile(q)
+    
+    def numeric_summary(self, columns: List[str]) -> Dict[str, Dict[str, float]]:
+        summary = {}
+        for col in columns:
+            series = self.df[col]
+            summary[col] = {
+                "mean": series.mean(),
+                "median": series.median(),
+                "std": series.std(),
+                "min": series.min(),
+                "max": series.max(),
+                "q1": series.quantile(0.25),
+                "q3": series.quantile(0.75),
+                "skewness": series.skew(),
+                "kurtosis": series.kurtosis()
+            }
+        
+        return summary
+    
+    def value_counts(self, column: str, top: Optional[int] = None) -> pd.Series:
+        counts = self.df[column].value_counts()
+        return counts if top is None else counts.head(top)
+    
+    def accuracy_counts(self, bounds: Dict[str, Tuple[float, float]]) -> Dict[str, Dict[str, int]]:
+        counts = {}
+        for col, (lower, upper) in bounds.items():
+            values = self.df[col]
+            counts[col] = {
+                "negative_count": int((values < 0).sum()),
+                "zero_count": int((values == 0).sum()),
+                "outlier_count": int(((values < lower) | (values > upper)).sum())
+            }
+        
+        return counts
+    
+    def pattern_match_counts(self, patterns: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, int]]:
+        counts = {}
+        for col, column_patterns in patterns.items():
+            values = self.df[col].astype(str)
+            counts[col] = {
+                name: int(values.str.match(pattern, na=False).sum())
+                for name, pattern in column_patterns.items()
+            }
+        
+        return counts
+    
+    def corr(self, columns: List[str]) -> pd.DataFrame:
+        return self.df[columns].corr()
+    
+    def crosstab(self, index: str, columns: str) -> pd.DataFrame:
+        return pd.crosstab(self.df[index], self.df[columns])
+    
+    def head(self, n: int) -> pd.DataFrame:
+        return self.df.head(n)
+    
+    def tail(self, n: int) -> pd.DataFrame:
+        return self.df.tail(n)
+    
+    def sample(self, n: int, seed: Optional[int] = None, ordered: bool = False) -> pd.DataFrame:
+        n = min(n, len(self.df))
+        if not ordered:
+            return self.df.sample(n, random_state=seed)
+        
+        positions = pd.Series(np.arange(len(self.df))).sample(n, random_state=seed)
+        return self.df.iloc[np.sort(positions.to_numpy())]
+    
+    def prepare(self,
+                columns: List[str],
+                fill_values: Dict[str, Any],
+                distinct: bool = False) -> "PandasEngine":
+        df = self.df[columns].copy()
+        for col, value in fill_values.items():
+            df[col] = df[col].fillna(value)
+        
+        if distinct:
+            df = df.drop_duplicates()
+        
+        return PandasEngine(df)
+
+
+class DuckDBEngine(DataEngine):
+    """
+    DuckDB 外存引擎
+    直接在本地 CSV/Parquet 文件上执行向量化、多线程的聚合查询，
+    数据不加载到 pandas，只有聚合结果和少量样本行会被取回
+    """
+    
+    # CSV 只推断布尔、整数、浮点和文本类型，与 pandas.read_csv 一致，
+    # 日期等其他值保持为文本，按分类列统计并参与格式一致性检查
+    SOURCE_READERS = {
+        '.csv': "read_csv_auto({path}, auto_type_candidates=['BOOLEAN', 'BIGINT', 'DOUBLE', 'VARCHAR'])",
+        '.parquet': "read_parquet({path})"
+    }
+    
+    # 清洗后临时表中记录原始行序的列
+    ORDER_COLUMN = '__row_order'
+    
+    
+    NUMERIC_TYPES = [
+        'TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'HUGEINT',
+        'UTINYINT', 'USMALLINT', 'UINTEGER', 'UBIGINT', 'UHUGEINT',
+        'FLOAT', 'DOUBLE', 'DECIMAL'
+    ]
+    
+    def __init__(self,
+                 file_path: str,
+                 database: str = ':memory:',
+                 threads: Optional[int] = None,
+                 memory_limit: Optional[str] = None,
+                 exact_quantiles: bool = False,
+                 batch_size: int = 256):
+        """
+        初始化 DuckDB 引擎
+        
+        Args:
+            file_path: 数据文件路径（.csv 或 .parquet）
+            database: DuckDB 数据库路径，去重等中间结果超出内存时会落盘
+            threads: 执行线程数，默认使用全部核心
+            memory_limit: 内存上限，如 '8GB'
+            exact_quantiles: 是否计算精确分位数，默认使用近似分位数以支持超大文件
+            batch_size: 单条查询中的最大聚合表达式数
+        """
+        if duckdb is None:
+            raise ImportError("DuckDB引擎需要安装 duckdb: pip install duckdb")
+        
+        file_path = Path(file_path)
+        if not file_path.exists():
+            raise FileNotFoundError(f"文件不存在: {file_path}")
+        
+        reader = self.SOURCE_READERS.get(file_path.suffix.lower())
+        if reader is None:
+            raise ValueError(f"DuckDB引擎不支持的文件格式: {file_path.suffix}")
+        
+        self.connection = duckdb.connect(database)
+        if threads is not None:
+            self.connection.execute(f"SET threads = {int(threads)}")
+        if memory_limit is not None:
+            self.connection.execute("SET memory_limit = ?", [memory_limit])
+        
+        self.file_path = file_path
+        self.exact_quantiles = exact_quantiles
+        self.batch_size = batch_size
+        self.relation = reader.format(path=self._literal(str(file_path)))
+        self.ordered = False
+        self._load_schema()
+    
+    @classmethod
+    def _from_relation(cls, parent: "DuckDBEngine", relation: str) -> "DuckDBEngine":
+        """基于已有连接中的表或视图创建引擎"""
+        engine = cls.__new__(cls)
+        engine.connection = parent.connection
+        engine.file_path = parent.file_path
+        engine.exact_quantiles = parent.exact_quantiles
+        engine.batch_size = parent.batch_size
+        engine.relation = relation
+        engine.ordered = True
+        engine._load_schema()
+        return engine
+    
+    def _load_schema(self):
+        """读取列名、类型和行数"""
+        schema = self.connection.execute(f"DESCRIBE SELECT {self._select_list()} FROM {self.relation}").fetchall()
+        self._dtypes = {row[0]: row[1] for row in schema}
+        self._row_count = None
+    
+    def _select_list(self) -> str:
+        """数据列选择表达式，不包含行序列"""
+        if self.ordered:
+            return f"* EXCLUDE ({self._identifier(self.ORDER_COLUMN)})"
+        return "*"
+    
+    def _ordered_source(self) -> str:
+        """带原始行序列的数据源，直接读取文件时按读取顺序编号"""
+        if self.ordered:
+            return self.relation
+        order = self._identifier(self.ORDER_COLUMN)
+        return f"(SELECT *, row_number() OVER () AS {order} FROM {self.relation})"
+    
+    @staticmethod
+    def _identifier(name: str) -> str:
+        """SQL 标识符转义"""
+        return '"' + str(name).replace('"', '""') + '"'
+    
+    @staticmethod
+    def _literal(value: str) -> str:
+        """SQL 字符串字面量转义"""
+        return "'" + str(value).replace("'", "''") + "'"
+    
+    def _aggregate(self, expressions: List[str], parameters: Optional[List[Any]] = None) -> List[Any]:
+        """分批执行聚合表达式，每批扫描一次数据"""
+        results = []
+        for start in range(0, len(expressions), self.batch_size):
+            batch = expressions[start:start + self.batch_size]
+            params = None
+            if parameters is not None:
+                params = list(itertools.chain.from_iterable(
+                    parameters[start:start + self.batch_size]
+                ))
+            
+            row = self.connection.execute(
+                f"SELECT {', '.join(batch)} FROM {self.relation}", params
+            ).fetchone()
+            results.extend(row)
+        
+        return results
+    
+    def _quantile_function(self) -> str:
+        """分位数函数"""
+        return "quantile_cont" if self.exact_quantiles else "approx_quantile"
+    
+    def columns(self) -> List[str]:
+        return list(self._dtypes)
+    
+    def dtypes(self) -> Dict[str, Any]:
+        return dict(self._dtypes)
+    
+    def row_count(self) -> int:
+        if self._row_count is None:
+            self._row_count = int(self._aggregate(["count(*)"])[0])
+        return self._row_count
+    
+    def memory_usage(self) -> int:
+        # 外存引擎不加载数据，以源文件大小代替
+        return self.file_path.stat().st_size
+    
+    def numeric_columns(self) -> List[str]:
+        return [
+            col for col, dtype in self._dtypes.items()
+            if dtype.split('(')[0] in self.NUMERIC_TYPES
+        ]
+    
+    def categorical_columns(self) -> List[str]:
+        return [col for col, dtype in self._dtypes.items() if dtype == 'VARCHAR']
+    
+    def null_counts(self, columns: Optional[List[str]] = None) -> Dict[str, int]:
+        columns = self.columns() if columns is None else columns
+        values = self._aggregate([
+            f"count(*) - count({self._identifier(col)})" for col in columns
+        ])
+        return {col: int(value) for col, value in zip(columns, values)}
+    
+    def nunique(self, columns: List[str]) -> Dict[str, int]:
+        values = self._aggregate([
+            f"count(DISTINCT {self._identifier(col)})" for col in columns
+        ])
+        return {col: int(value) for col, value in zip(columns, values)}
+    
+    def quantiles(self, columns: List[str], q: List[float]) -> pd.DataFrame:
+        function = self._quantile_function()
+        expressions = [
+            f"{function}({self._identifier(col)}, {float(point)})"
+            for col in columns for point in q
+        ]
+        values = np.array(self._aggregate(expressions), dtype=float).reshape(len(columns), len(q))
+        return pd.DataFrame(values.T, index=q, columns=columns)
+    
+    def numeric_summary(self, columns: List[str]) -> Dict[str, Dict[str, float]]:
+        # 四分位数和中位数由一次分位数计算得到，每列只构建一个分位数草图
+        metrics = {
+            "mean": "avg({0})",
+            "quartiles": self._quantile_function() + "({0}, [0.25, 0.5, 0.75])",
+            "std": "stddev_samp({0})",
+            "min": "min({0})",
+            "max": "max({0})",
+            # 常数列的偏度和峰度按 pandas 的约定取0
+            "skewness": "CASE WHEN count({0}) > 2 AND min({0}) = max({0}) THEN 0 ELSE skewness({0}) END",
+            "kurtosis": "CASE WHEN count({0}) > 3 AND min({0}) = max({0}) THEN 0 ELSE kurtosis({0}) END"
+        }
+        
+        expressions = [
+            template.format(self._identifier(col))
+            for col in columns for template in metrics.values()
+        ]
+        values = self._aggregate(expressions)
+        
+        summary = {}
+        for i, col in enumerate(columns):
+            row = dict(zip(metrics, values[i * len(metrics):(i + 1) * len(metrics)]))
+            q1, median, q3 = row.pop("quartiles") or [None, None, None]
+            row.update({"median": median, "q1": q1, "q3": q3})
+            
+            summary[col] = {
+                name: (np.nan if row[name] is None else row[name])
+                for name in ["mean", "median", "std", "min", "max", "q1", "q3", "skewness", "kurtosis"]
+            }
+        
+        return summary
+    
+    def value_counts(self, column: str, top: Optional[int] = None) -> pd.Series:
+        col = self._identifier(column)
+        order = self._identifier(self.ORDER_COLUMN)
+        limit = f"LIMIT {int(top)}" if top is not None else ""
+        
+        # 频数相同时按首次出现的位置排序，与 pandas 的 value_counts 一致
+        rows = self.connection.execute(
+            f"SELECT {col}, count(*) AS frequency, min({order}) AS first_row FROM {self._ordered_source()} "
+            f"WHERE {col} IS NOT NULL GROUP BY {col} ORDER BY frequency DESC, first_row {limit}"
+        ).fetchall()
+        
+        return pd.Series(
+            [row[1] for row in rows],
+            index=[row[0] for row in rows],
+            name="count",
+            dtype="int64"
+        )
+    
+    def accuracy_counts(self, bounds: Dict[str, Tuple[float, float]]) -> Dict[str, Dict[str, int]]:
+        expressions = []
+        for col, (lower, upper) in bounds.items():
+            identifier = self._identifier(col)
+            expressions.extend([
+                f"count(*) FILTER (WHERE {identifier} < 0)",
+                f"count(*) FILTER (WHERE {identifier} = 0)",
+                f"count(*) FILTER (WHERE {identifier} < {float(lower)!r} OR {identifier} > {float(upper)!r})"
+                if np.isfinite(lower) and np.isfinite(upper) else "0"
+            ])
+        
+        values = self._aggregate(expressions)
+        
+        counts = {}
+        for i, col in enumerate(bounds):
+            negative, zero, outlier = values[i * 3:(i + 1) * 3]
+            counts[col] = {
+                "negative_count": int(negative),
+                "zero_count": int(zero),
+                "outlier_count": int(outlier)
+            }
+        
+        return counts
+    
+    def pattern_match_counts(self, patterns: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, int]]:
+        # 所有列的所有规则合并为一批聚合表达式，按 batch_size 分批扫描
+        items = [(col, name, pattern) for col, column_patterns in patterns.items()
+                 for name, pattern in column_patterns.items()]
+        values = self._aggregate(
+            [f"count(*) FILTER (WHERE regexp_matches(CAST({self._identifier(col)} AS VARCHAR), ?))"
+             for col, _, _ in items],
+            [[pattern] for _, _, pattern in items]
+        )
+        
+        counts = {col: {} for col in patterns}
+        for (col, name, _), value in zip(items, values):
+            counts[col][name] = int(value)
+        
+        return counts
+    
+    def corr(self, columns: List[str]) -> pd.DataFrame:
+        pairs = list(itertools.combinations_with_replacement(range(len(columns)), 2))
+        values = self._aggregate([
+            f"corr({self._identifier(columns[i])}, {self._identifier(columns[j])})"
+            for i, j in pairs
+        ])
+        
+        matrix = np.full((len(columns), len(columns)), np.nan)
+        for (i, j), value in zip(pairs, values):
+            if value is not None:
+                matrix[i, j] = matrix[j, i] = value
+        
+        return pd.DataFrame(matrix, index=columns, columns=columns)
+    
+    def crosstab(self, index: str, columns: str) -> pd.DataFrame:
+        row, col = self._identifier(index), self._identifier(columns)
+        counts = self.connection.execute(
+            f"SELECT {row} AS row_value, {col} AS col_value, count(*) AS frequency FROM {self.relation} "
+            f"WHERE {row} IS NOT NULL AND {col} IS NOT NULL GROUP BY {row}, {col}"
+        ).df()
+        
+        table = counts.pivot(index="row_value", columns="col_value", values="frequency")
+        table = table.fillna(0).astype("int64").sort_index().sort_index(axis=1)
+        table.index.name = index
+        table.columns.name = columns
+        return table
+    
+    def head(self, n: int) -> pd.DataFrame:
+        # 直接读取文件时 DuckDB 保持文件中的行序，清洗后的临时表按记录的原始行序排序
+        order = f"ORDER BY {self._identifier(self.ORDER_COLUMN)} " if self.ordered else ""
+        return self.connection.execute(
+            f"SELECT {self._select_list()} FROM {self.relation} {order}LIMIT {int(n)}"
+        ).df()
+    
+    def tail(self, n: int) -> pd.DataFrame:
+        if not self.ordered:
+            offset = max(self.row_count() - int(n), 0)
+            return self.connection.execute(
+                f"SELECT * FROM {self.relation} LIMIT {int(n)} OFFSET {offset}"
+            ).df()
+        
+        order = self._identifier(self.ORDER_COLUMN)
+        return self.connection.execute(
+            f"SELECT {self._select_list()} FROM "
+            f"(SELECT * FROM {self.relation} ORDER BY {order} DESC LIMIT {int(n)}) "
+            f"ORDER BY {order}"
+        ).df()
+    
+    def sample(self, n: int, seed: Optional[int] = None, ordered: bool = False) -> pd.DataFrame:
+        # 小样本时 reservoir 抽样只会取到文件开头的行，改为按随机数取 top-n，流式扫描全部数据
+        if seed is not None:
+            self.connection.execute("SELECT setseed(?)", [(int(seed) % 2 ** 31) / 2 ** 31])
+        
+        order = self._identifier(self.ORDER_COLUMN)
+        ordering = f"ORDER BY {order}" if ordered else ""
+        return self.connection.execute(
+            f"SELECT * EXCLUDE ({order}) FROM "
+            f"(SELECT * FROM {self._ordered_source()} ORDER BY random() LIMIT {int(n)}) {ordering}"
+        ).df()
+    
+    def prepare(self,
+                columns: List[str],
+                fill_values: Dict[str, Any],
+                distinct: bool = False) -> "DuckDBEngine":
+        selections = []
+        for col in columns:
+            identifier = self._identifier(col)
+            if col in fill_values:
+                fill = fill_values[col]
+                value = self._literal(fill) if isinstance(fill, str) else repr(fill)
+                selections.append(f"coalesce({identifier}, {value}) AS {identifier}")
+            else:
+                selections.append(identifier)
+        
+        # 记录原始行序，去重时保留每组首次出现的位置（同 drop_duplicates 的 keep='first'）
+        order = self._identifier(self.ORDER_COLUMN)
+        source = self._ordered_source()
+        
+        if distinct:
+            query = f"SELECT {', '.join(selections)}, min({order}) AS {order} FROM {source} GROUP BY ALL"
+        else:
+            query = f"SELECT {', '.join(selections)}, {order} FROM {source}"
+        
+        # 物化为临时表，后续各项统计不再重复执行清洗和去重；表名唯一，不会覆盖其他引擎正在使用的表
+        table = f"prepared_{uuid.uuid4().hex}"
+        self.connection.execute(f"CREATE TEMP TABLE {table} AS {query}")
+        
+        return DuckDBEngine._from_relation(self, table)
+
+
+def as_engine(data: Union[pd.DataFrame, DataEngine]) -> DataEngine:
+    """将 DataFrame 包装为 pandas 引擎，已是引擎时原样返回"""
+    if isinstance(data, DataEngine):
+        return data
+    return PandasEngine(data)
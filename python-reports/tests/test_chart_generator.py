@@ -0,0 +1,103 @@
+"""
+图表生成器测试
+"""
+
+import matplotlib
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from visualizers.chart_generator import ChartGenerator
+
+pytestmark = pytest.mark.filterwarnings("ignore:Glyph")
+
+
+def _artist_counts(generator: ChartGenerator):
+    """统计所有模板子图中的元素和容器数量"""
+    return {
+        key: [(len(ax.get_children()), len(ax.containers)) for ax in template["axes"]]
+        for key, template in generator._figure_templates.items()
+    }
+
+
+@pytest.mark.parametrize("chart_type", ["sample_distribution", "variable_distribution", "outlier_detection"])
+def test_reused_template_does_not_accumulate_artists(tmp_path, chart_type):
+    """同一模板重复渲染时，子图中的元素和容器数量保持不变"""
+    rng = np.random.default_rng(0)
+    generator = ChartGenerator(tmp_path)
+
+    counts = []
+    for i in range(4):
+        df = pd.DataFrame(rng.normal(i, 1, size=(200, 5)), columns=list("abcde"))
+        generator._generate_chart(df, chart_type, f"report{i}")
+        counts.append(_artist_counts(generator))
+
+    assert len(generator._figure_templates) == 1
+    assert all(item == counts[0] for item in counts[1:])
+
+
+def _wide_frame() -> pd.DataFrame:
+    """构造含非数值列的宽表"""
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(rng.normal(size=(300, 10)), columns=[f"v{i}" for i in range(10)])
+    df["label"] = "x"
+    df["event_date"] = pd.date_range("2024-01-01", periods=300).astype(str)
+    return df
+
+
+def test_config_round_trip(tmp_path):
+    """from_config 创建的生成器与原生成器配置一致"""
+    from processors.density_engine import DensityEngine
+    
+    generator = ChartGenerator(tmp_path, reuse_figures=False, sample_rows=500,
+                               density_engine=DensityEngine(bins=12, bw_method=0.4, chunk_size=3))
+    generator.colors = ["#000000", "#ffffff"]
+    generator.figsize = (6, 4)
+    
+    assert ChartGenerator.from_config(generator.config()).config() == generator.config()
+
+
+def test_page_worker_reuses_one_generator(tmp_path):
+    """子进程初始化后，渲染多页时复用同一个生成器的模板"""
+    from visualizers import chart_generator
+    
+    generator = ChartGenerator(tmp_path)
+    pages = generator.paginate_chart(_wide_frame(), "variable_distribution", "r", page_size=5, rank_by=None)
+    
+    chart_generator._init_page_worker(generator.config())
+    worker = chart_generator._page_generator
+    for page in range(len(pages)):
+        chart_generator._render_chart_page(pages.chart_type, pages._page_report_type(page), pages._page_frame(page))
+    
+    assert chart_generator._page_generator is worker
+    assert len(worker._figure_templates) == 1
+
+
+def test_page_frame_only_keeps_needed_columns(tmp_path):
+    """分页数据只包含当页变量，趋势图额外保留日期列"""
+    generator = ChartGenerator(tmp_path)
+    df = _wide_frame()
+    
+    pages = generator.paginate_chart(df, "box_plot", "r", page_size=4, rank_by=None)
+    assert list(pages._page_frame(0).columns) == ["v0", "v1", "v2", "v3"]
+    
+    pages = generator.paginate_chart(df, "trend_analysis", "r", rank_by=None)
+    assert list(pages._page_frame(1).columns) == ["event_date", "v5", "v6", "v7", "v8", "v9"]
+
+
+def test_parallel_pages_match_serial_rendering(tmp_path):
+    """多进程渲染使用主进程生成器的配置（关闭模板复用时各页布局独立），结果与单进程渲染一致"""
+    df = _wide_frame()
+    
+    outputs = {}
+    for workers in [1, 2]:
+        generator = ChartGenerator(tmp_path / str(workers), reuse_figures=False)
+        generator.colors = ["#000000"]
+        pages = generator.paginate_chart(df, "sample_distribution", "r", rank_by=None)
+        paths = pages.render_pages(max_workers=workers)
+        outputs[workers] = [open(paths[page], "rb").read() for page in sorted(paths)]
+    
+    assert len(outputs[1]) == 3
+    assert outputs[1] == outputs[2]
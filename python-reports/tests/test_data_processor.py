@@ -0,0 +1,103 @@
+"""
+数据处理器导出测试
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from processors import data_processor
+from processors.data_processor import DataProcessor
+
+
+def _frame() -> pd.DataFrame:
+    """构造含缺失值、日期和分类列的数据"""
+    return pd.DataFrame({
+        "amount": [1.5, np.nan, 3.0, 4.0, 100.0],
+        "count": [1, 2, 2, 3, 4],
+        "city": ["a", "b", "a", None, "c"],
+        "created": pd.to_datetime(
+            ["2024-01-01", "2024-01-02", None, "2024-01-04", "2024-01-05 10:30:00"], format="ISO8601"
+        )
+    })
+
+
+@pytest.fixture
+def stats():
+    stats = DataProcessor().generate_statistics(_frame())
+    # 非字符串取值作为分布的键
+    stats["categorical_stats"]["city"]["value_distribution"].update({
+        np.int64(7): 1, 2.5: 1, False: 1, None: 1, pd.Timestamp("2024-01-01"): 1
+    })
+    return stats
+
+
+def _dumps(stats, use_orjson: bool, monkeypatch) -> bytes:
+    """按指定的序列化路径导出JSON"""
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(data_processor, "orjson", None)
+
+    return DataProcessor().statistics_to_json(stats)
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_statistics_to_json_values(stats, use_orjson, monkeypatch):
+    """NaN 写为 null，类型和时间写为字符串"""
+    document = json.loads(_dumps(stats, use_orjson, monkeypatch))
+
+    data_types = document["basic_info"]["data_types"]
+    assert data_types["amount"] == "float64"
+    assert data_types["city"] == str(_frame()["city"].dtype)
+    assert data_types["created"].startswith("datetime64")
+    assert document["sample_data"]["head"][1]["amount"] is None
+    assert document["sample_data"]["head"][0]["created"] == "2024-01-01T00:00:00"
+    assert document["sample_data"]["head"][2]["created"] is None
+    assert document["categorical_stats"]["city"]["value_distribution"] == {
+        "a": 2, "b": 1, "c": 1, "7": 1, "2.5": 1, "false": 1, "null": 1, "2024-01-01T00:00:00": 1
+    }
+
+
+def test_statistics_to_json_paths_match(stats, monkeypatch):
+    """orjson 和标准库 json 生成相同的文档"""
+    fast = json.loads(_dumps(stats, True, monkeypatch))
+    fallback = json.loads(_dumps(stats, False, monkeypatch))
+
+    assert fast == fallback
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "feather"])
+@pytest.mark.parametrize("drop_categorical", [False, True])
+def test_save_statistics_tables_round_trip(tmp_path, file_format, drop_categorical):
+    """列式文件读回后与内存中的表一致，没有分类变量时仍保留指标列"""
+    pytest.importorskip("pyarrow")
+
+    df = _frame()
+    if drop_categorical:
+        df = df.drop(columns=["city"])
+
+    processor = DataProcessor()
+    stats = processor.generate_statistics(df)
+    tables = processor.statistics_to_tables(stats)
+    paths = processor.save_statistics_tables(stats, tmp_path, file_format)
+
+    assert set(paths) == set(tables)
+    for name, table in tables.items():
+        read = pd.read_parquet(paths[name]) if file_format == "parquet" else pd.read_feather(paths[name])
+        assert list(read.columns) == list(table.columns)
+        pd.testing.assert_frame_equal(read, table, check_dtype=not table.empty)
+
+    if drop_categorical:
+        assert tables["categorical_stats"].empty
+        assert list(tables["categorical_stats"].columns) == [
+            "column", *DataProcessor.TABLE_METRICS["categorical_stats"]
+        ]
+
+
+def test_save_statistics_tables_rejects_unknown_format(tmp_path):
+    processor = DataProcessor()
+    with pytest.raises(ValueError):
+        processor.save_statistics_tables(processor.generate_statistics(_frame()), tmp_path, "csv")
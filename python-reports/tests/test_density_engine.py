@@ -0,0 +1,100 @@
+"""
+密度计算引擎测试
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from processors.density_engine import DensityEngine
+
+stats = pytest.importorskip("scipy.stats")
+
+
+def _heavy_tailed_frame() -> pd.DataFrame:
+    """构造偏态和含极端值的数据"""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "lognormal": pd.Series(rng.lognormal(0, 2.5, 20000)),
+        "outlier": pd.Series(np.r_[rng.normal(size=20000), 1e4]),
+        "normal": pd.Series(rng.normal(5, 3, 5000))
+    })
+
+
+@pytest.mark.parametrize("bw_method", ["scott", "silverman", 0.3])
+def test_kde_matches_gaussian_kde_on_heavy_tailed_data(bw_method):
+    """带宽小于默认网格步长时，曲线仍与 scipy 一致且积分为1"""
+    df = _heavy_tailed_frame()
+    densities = DensityEngine(bw_method=bw_method).compute(df)
+    
+    for col in df.columns:
+        values = df[col].dropna().to_numpy()
+        kde_x = densities[col]["kde_x"]
+        kde_y = densities[col]["kde_y"]
+        reference = stats.gaussian_kde(values, bw_method=bw_method)
+        
+        assert densities[col]["bandwidth"] == pytest.approx(reference.factor * values.std(ddof=1))
+        assert np.trapezoid(kde_y, kde_x) == pytest.approx(1, abs=0.01)
+        
+        # 抽取部分网格点与 scipy 对比，误差相对峰值不超过 1%
+        points = kde_x[::8]
+        expected = reference(points)
+        assert np.abs(kde_y[::8] - expected).max() <= 0.01 * expected.max()
+
+
+def test_histogram_matches_numpy():
+    """直方图分箱与 np.histogram 一致"""
+    df = _heavy_tailed_frame()
+    densities = DensityEngine().compute(df)
+    
+    for col in df.columns:
+        counts, edges = np.histogram(df[col].dropna(), bins=30)
+        np.testing.assert_array_equal(densities[col]["counts"], counts)
+        np.testing.assert_allclose(densities[col]["bin_edges"], edges)
+
+
+def test_compute_only_requested_columns():
+    """只计算指定的列，关闭核密度时不生成曲线"""
+    df = _heavy_tailed_frame().assign(label="x")
+    engine = DensityEngine()
+    
+    densities = engine.compute(df, ["normal", "label", "lognormal"], kde=False)
+    assert list(densities) == ["normal", "lognormal"]
+    assert all(item["kde_x"] is None and item["kde_y"] is None for item in densities.values())
+    
+    densities = engine.compute(df, ["outlier"])
+    assert list(densities) == ["outlier"]
+    assert densities["outlier"]["kde_y"] is not None
+
+
+def test_chunked_compute_matches_single_batch():
+    """分批计算与一次计算全部列的结果一致"""
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(rng.lognormal(0, 2, size=(2000, 7)), columns=[f"v{i}" for i in range(7)])
+    df.iloc[:, 3] = np.nan
+    
+    chunked = DensityEngine(chunk_size=2).compute(df)
+    single = DensityEngine(chunk_size=100).compute(df)
+    
+    assert list(chunked) == list(single) == [col for col in df.columns if col != "v3"]
+    for col in single:
+        for key, value in single[col].items():
+            np.testing.assert_allclose(chunked[col][key], value)
+
+
+def test_cache_is_bounded_by_bytes():
+    """缓存总字节数不超过上限，超出时淘汰最久未使用的结果"""
+    rng = np.random.default_rng(2)
+    frames = [pd.DataFrame(rng.normal(size=(500, 3)), columns=list("abc")) for _ in range(4)]
+    
+    engine = DensityEngine()
+    engine.compute(frames[0])
+    single_size = engine._cache_bytes
+    
+    engine = DensityEngine(max_cache_bytes=int(single_size * 2.5))
+    results = [engine.compute(df) for df in frames]
+    
+    assert len(engine._cache) == 2
+    assert engine._cache_bytes <= engine.max_cache_bytes
+    assert engine.compute(frames[-1]) is results[-1]
+    assert engine.compute(frames[0]) is not results[0]
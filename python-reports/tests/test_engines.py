@@ -0,0 +1,161 @@
+"""
+数据引擎测试
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from processors.engines import DuckDBEngine, PandasEngine
+
+pytest.importorskip("duckdb")
+
+
+@pytest.fixture(scope="module")
+def large_parquet(tmp_path_factory):
+    """行号递增的大文件，用于检查抽样覆盖范围"""
+    pytest.importorskip("pyarrow")
+    path = tmp_path_factory.mktemp("engines") / "large.parquet"
+    rows = 300000
+    pd.DataFrame({
+        "row_id": np.arange(rows),
+        "value": np.random.default_rng(0).normal(size=rows)
+    }).to_parquet(path)
+    return path, rows
+
+
+@pytest.mark.parametrize("prepared", [False, True])
+def test_duckdb_sample_covers_whole_file(large_parquet, prepared):
+    """小样本也从整个文件中均匀抽取，而不是集中在文件开头"""
+    path, rows = large_parquet
+    engine = DuckDBEngine(path, threads=2)
+    if prepared:
+        engine = engine.prepare(engine.columns(), {}, distinct=True)
+
+    row_ids = np.concatenate([engine.sample(10, seed=seed)["row_id"].to_numpy() for seed in range(8)])
+
+    assert len(row_ids) == 80
+    assert row_ids.max() > 0.9 * rows
+    assert row_ids.min() < 0.1 * rows
+    assert 0.35 * rows < row_ids.mean() < 0.65 * rows
+
+
+def test_duckdb_sample_is_repeatable_with_seed(large_parquet):
+    path, _ = large_parquet
+    engine = DuckDBEngine(path)
+
+    pd.testing.assert_frame_equal(engine.sample(10, seed=3), engine.sample(10, seed=3))
+
+
+@pytest.mark.parametrize("prepared", [False, True])
+def test_duckdb_ordered_sample_keeps_file_order(large_parquet, prepared):
+    """按行序抽样时返回的行保持文件中的顺序"""
+    path, _ = large_parquet
+    engine = DuckDBEngine(path)
+    if prepared:
+        engine = engine.prepare(engine.columns(), {})
+
+    sample = engine.sample(1000, seed=1, ordered=True)
+
+    assert list(sample.columns) == ["row_id", "value"]
+    assert len(sample) == 1000
+    assert sample["row_id"].is_monotonic_increasing
+
+
+def test_pandas_ordered_sample_keeps_frame_order():
+    df = pd.DataFrame({"value": np.arange(100)}, index=np.arange(100)[::-1])
+
+    sample = PandasEngine(df).sample(10, seed=0, ordered=True)
+
+    assert sample["value"].is_monotonic_increasing
+    assert set(sample["value"]) == set(PandasEngine(df).sample(10, seed=0)["value"])
+
+
+def _profile_frame() -> pd.DataFrame:
+    """构造含缺失值、重复行、并列频数、日期字符串和稀疏列的数据"""
+    rng = np.random.default_rng(0)
+    rows = 3000
+    df = pd.DataFrame({
+        "amount": np.round(rng.lognormal(0, 1.5, rows) - 0.5, 3),
+        "qty": rng.integers(-2, 20, rows),
+        "city": rng.choice(["beijing", "shanghai", "shenzhen", "hangzhou"], rows),
+        # 各日期频数相同，并列时按首次出现排序，"2024-01-03" 排在最前
+        "dt": np.tile(["2024-01-03", "2024-01-02", "2024-01-04"], rows // 3),
+        "contact": rng.choice(["a@b.com", "13800000000", "010-1234-5678", "none"], rows),
+        "sparse": np.where(rng.random(rows) < 0.9, np.nan, 1.0)
+    })
+    df.loc[rng.random(rows) < 0.1, "amount"] = np.nan
+    df.loc[rng.random(rows) < 0.05, "city"] = None
+    
+    # 追加重复行
+    return pd.concat([df, df.iloc[100:400]], ignore_index=True)
+
+
+@pytest.fixture(scope="module")
+def profile_files(tmp_path_factory):
+    """相同数据的 CSV 和 Parquet 文件"""
+    pytest.importorskip("pyarrow")
+    directory = tmp_path_factory.mktemp("profile")
+    df = _profile_frame()
+    df.to_csv(directory / "data.csv", index=False)
+    df.to_parquet(directory / "data.parquet", index=False)
+    return directory
+
+
+def _assert_records_equal(actual, expected):
+    pd.testing.assert_frame_equal(
+        pd.DataFrame(actual).astype(object).fillna(np.nan),
+        pd.DataFrame(expected).astype(object).fillna(np.nan),
+        check_dtype=False
+    )
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+@pytest.mark.parametrize("clean", [True, False])
+def test_duckdb_profile_matches_pandas(profile_files, suffix, clean):
+    """精确分位数下 DuckDB 引擎与 pandas 引擎的统计结果逐项一致"""
+    from processors.data_processor import DataProcessor
+    
+    processor = DataProcessor()
+    expected = processor.profile_file(profile_files / "data.csv", engine="pandas", clean=clean)
+    actual = processor.profile_file(profile_files / f"data{suffix}", engine="duckdb",
+                                    clean=clean, exact_quantiles=True, threads=4)
+    
+    # 基础信息（内存占用和类型名称因引擎而异）
+    for key in ["total_rows", "total_columns"]:
+        assert actual["basic_info"][key] == expected["basic_info"][key]
+    assert list(actual["basic_info"]["data_types"]) == list(expected["basic_info"]["data_types"])
+    
+    # 数值统计
+    assert list(actual["numeric_stats"]) == list(expected["numeric_stats"])
+    for col, metrics in expected["numeric_stats"].items():
+        for metric, value in metrics.items():
+            assert actual["numeric_stats"][col][metric] == pytest.approx(value, rel=1e-9, nan_ok=True), (col, metric)
+    
+    # 分类统计，包括并列频数的顺序
+    assert actual["categorical_stats"] == expected["categorical_stats"]
+    for col, item in expected["categorical_stats"].items():
+        assert list(actual["categorical_stats"][col]["value_distribution"]) == list(item["value_distribution"])
+    assert expected["categorical_stats"]["dt"]["top_value"] == "2024-01-03"
+    
+    # 质量指标
+    assert actual["quality_metrics"] == expected["quality_metrics"]
+    
+    # 样本数据：前后各10行与 pandas 顺序一致，随机样本行数一致
+    for key in ["head", "tail"]:
+        _assert_records_equal(actual["sample_data"][key], expected["sample_data"][key])
+    assert len(actual["sample_data"]["random"]) == len(expected["sample_data"]["random"])
+
+
+def test_duckdb_prepare_does_not_overwrite_previous_table(profile_files):
+    """同一引擎多次 prepare 的结果互不影响"""
+    engine = DuckDBEngine(profile_files / "data.parquet")
+    
+    first = engine.prepare(["amount", "qty"], {"amount": 0})
+    second = engine.prepare(["city", "dt"], {"city": ""}, distinct=True)
+    
+    assert first.columns() == ["amount", "qty"]
+    assert first.row_count() == 3300
+    assert first.null_counts()["amount"] == 0
+    assert second.columns() == ["city", "dt"]
+    assert second.row_count() < 3300
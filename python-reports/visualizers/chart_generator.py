@@ -4,13 +4,19 @@
 """
 
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import seaborn as sns
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Callable, Union
 import io
+import json
 import base64
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from processors.density_engine import DensityEngine
+from processors.engines import DataEngine, as_engine
 
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
@@ -27,8 +33,42 @@ class ChartGenerator:
     负责根据数据生成各种统计图表
     """
     
-    def __init__(self, output_dir: str = "charts"):
-        """初始化图表生成器"""
+    # 支持分页的图表类型及每页变量数
+    PAGE_SIZES = {
+        "sample_distribution": 4,
+        "variable_distribution": 6,
+        "outlier_detection": 4,
+        "trend_analysis": 5,
+        "box_plot": 20,
+        "violin_plot": 20
+    }
+    
+    # 子图网格固定的图表，每页变量数不能超过 PAGE_SIZES 中的配置
+    FIXED_GRID_CHARTS = ["sample_distribution", "variable_distribution", "outlier_detection", "trend_analysis"]
+    
+    # 需要日期列作为横轴的图表，分页时保留非数值的日期列
+    DATE_AXIS_CHARTS = ["trend_analysis"]
+    
+    # 变量排序规则
+    RANK_METHODS = ['missing', 'outlier', 'variance', 'combined']
+    
+    # 只依赖聚合结果的图表，可直接由数据引擎计算
+    AGGREGATE_CHARTS = ["variable_correlation", "quality_score_distribution", "stacked_bar"]
+    
+    def __init__(self,
+                 output_dir: str = "charts",
+                 reuse_figures: bool = True,
+                 sample_rows: int = 100000,
+                 density_engine: Optional[DensityEngine] = None):
+        """
+        初始化图表生成器
+        
+        Args:
+            output_dir: 图表输出目录
+            reuse_figures: 是否复用图表模板（批量生成报告时只重绘数据部分）
+            sample_rows: 使用数据引擎时，逐行绘制的图表所用的抽样行数
+            density_engine: 分布类图表使用的密度计算引擎，可配置分箱数和带宽规则
+        """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
         
@@ -36,17 +76,62 @@ class ChartGenerator:
         self.colors = ['#1890ff', '#52c41a', '#faad14', '#f5222d', '#722ed1', '#13c2c2']
         self.figsize = (12, 8)
         
+        # 图表模板缓存: (图表类型, 行数, 列数, 尺寸) -> 模板
+        self.reuse_figures = reuse_figures
+        self._figure_templates: Dict[Tuple, Dict[str, Any]] = {}
+        
+        # 分布类图表共用的密度计算引擎
+        self.density_engine = density_engine or DensityEngine()
+        self.sample_rows = sample_rows
+        
+    def config(self) -> Dict[str, Any]:
+        """
+        获取生成器配置
+        
+        Returns:
+            可序列化的配置字典，传给 from_config 可在其他进程中创建相同配置的生成器
+        """
+        return {
+            "output_dir": str(self.output_dir),
+            "reuse_figures": self.reuse_figures,
+            "sample_rows": self.sample_rows,
+            "colors": list(self.colors),
+            "figsize": tuple(self.figsize),
+            "density_settings": {
+                **self.density_engine.settings(),
+                "chunk_size": self.density_engine.chunk_size,
+                "max_cache_bytes": self.density_engine.max_cache_bytes
+            }
+        }
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "ChartGenerator":
+        """根据 config 返回的配置创建生成器"""
+        generator = cls(
+            config["output_dir"],
+            reuse_figures=config["reuse_figures"],
+            sample_rows=config["sample_rows"],
+            density_engine=DensityEngine(**config["density_settings"])
+        )
+        generator.colors = list(config["colors"])
+        generator.figsize = tuple(config["figsize"])
+        return generator
+    
     def generate_charts(self, 
-                       df: pd.DataFrame, 
+                       df: Union[pd.DataFrame, DataEngine], 
                        report_type: str,
-                       chart_types: Optional[List[str]] = None) -> Dict[str, Any]:
+                       chart_types: Optional[List[str]] = None,
+                       paginate: bool = False,
+                       rank_by: Optional[str] = 'combined') -> Dict[str, Any]:
         """
         生成图表集合
         
         Args:
-            df: 数据DataFrame
+            df: 数据DataFrame，或数据引擎（聚合图表由引擎计算，其余图表使用抽样数据）
             report_type: 报告类型
             chart_types: 图表类型列表
+            paginate: 是否分页展示全部变量，开启后支持分页的图表返回 ChartPages
+            rank_by: 分页时的变量排序规则
             
         Returns:
             图表路径字典
@@ -55,10 +140,24 @@ class ChartGenerator:
             chart_types = self._get_default_charts(report_type)
         
         charts = {}
+        engine = as_engine(df)
+        frame = df if isinstance(df, pd.DataFrame) else None
         
         for chart_type in chart_types:
             try:
-                chart_path = self._generate_chart(df, chart_type, report_type)
+                if chart_type in self.AGGREGATE_CHARTS:
+                    charts[chart_type] = self._generate_chart(engine, chart_type, report_type)
+                    continue
+                
+                # 逐行绘制的图表只需加载一次抽样数据，按原始行序排列以便趋势图使用
+                if frame is None:
+                    frame = engine.sample(self.sample_rows, ordered=True)
+                
+                if paginate and chart_type in self.PAGE_SIZES:
+                    charts[chart_type] = self.paginate_chart(frame, chart_type, report_type, rank_by=rank_by)
+                    continue
+                
+                chart_path = self._generate_chart(frame, chart_type, report_type)
                 charts[chart_type] = chart_path
             except Exception as e:
                 print(f"生成图表 {chart_type} 失败: {e}")
@@ -91,12 +190,12 @@ class ChartGenerator:
         
         return default_charts.get(report_type, ["sample_distribution"])
     
-    def _generate_chart(self, df: pd.DataFrame, chart_type: str, report_type: str) -> str:
+    def _generate_chart(self, df: Union[pd.DataFrame, DataEngine], chart_type: str, report_type: str) -> str:
         """生成单个图表"""
         chart_methods = {
             "sample_distribution": self._create_sample_distribution,
             "variable_correlation": self._create_correlation_matrix,
-            "quality_score_distribution": self._create_quality_score_chart,
+            "quality_score_distribution": self._create_quality_score_distribution,
             "missing_value_heatmap": self._create_missing_value_heatmap,
             "variable_distribution": self._create_variable_distribution,
             "outlier_detection": self._create_outlier_detection,
@@ -109,42 +208,200 @@ class ChartGenerator:
         }
         
         method = chart_methods.get(chart_type)
-        if method:
+        if method and chart_type in self.AGGREGATE_CHARTS:
+            return method(as_engine(df), report_type)
+        elif method:
             return method(df, report_type)
         else:
             raise ValueError(f"不支持的图表类型: {chart_type}")
     
+    def rank_variables(self, df: pd.DataFrame, rank_by: Optional[str] = 'combined') -> List[str]:
+        """
+        按关注度对数值变量排序
+        
+        Args:
+            df: 数据DataFrame
+            rank_by: 排序规则，'missing' 缺失率、'outlier' 异常值比例、
+                     'variance' 方差、'combined' 综合得分，None 保持原始顺序
+            
+        Returns:
+            按得分从高到低排列的数值变量列表
+        """
+        if rank_by is not None and rank_by not in self.RANK_METHODS:
+            raise ValueError(f"不支持的排序规则: {rank_by}")
+        
+        numeric_df = df.select_dtypes(include=[np.number])
+        if numeric_df.empty or rank_by is None:
+            return list(numeric_df.columns)
+        
+        # 所有得分均按列向量化计算
+        missing = numeric_df.isnull().mean()
+        quartiles = numeric_df.quantile([0.25, 0.75])
+        iqr = quartiles.loc[0.75] - quartiles.loc[0.25]
+        outliers = (numeric_df < quartiles.loc[0.25] - 1.5 * iqr) | (numeric_df > quartiles.loc[0.75] + 1.5 * iqr)
+        outlier_rate = outliers.mean()
+        variance = numeric_df.var().fillna(0)
+        
+        scores = {
+            "missing": missing,
+            "outlier": outlier_rate,
+            "variance": variance,
+            "combined": missing + outlier_rate + variance.rank(pct=True)
+        }
+        
+        ranked = scores[rank_by].fillna(0).sort_values(ascending=False, kind='mergesort')
+        return list(ranked.index)
+    
+    def paginate_chart(self,
+                       df: pd.DataFrame,
+                       chart_type: str,
+                       report_type: str,
+                       page_size: Optional[int] = None,
+                       rank_by: Optional[str] = 'combined') -> "ChartPages":
+        """
+        将全部数值变量按关注度排序后分页
+        
+        页面不会立即渲染，通过 ChartPages.render / render_pages 按需生成
+        
+        Args:
+            df: 数据DataFrame
+            chart_type: 图表类型
+            report_type: 报告类型
+            page_size: 每页变量数，默认使用 PAGE_SIZES 中的配置；
+                       子图网格固定的图表不能超过该配置
+            rank_by: 变量排序规则
+            
+        Returns:
+            分页图表集合
+        """
+        if chart_type not in self.PAGE_SIZES:
+            raise ValueError(f"不支持分页的图表类型: {chart_type}")
+        
+        page_size = page_size or self.PAGE_SIZES[chart_type]
+        if chart_type in self.FIXED_GRID_CHARTS and page_size > self.PAGE_SIZES[chart_type]:
+            raise ValueError(
+                f"图表 {chart_type} 每页最多 {self.PAGE_SIZES[chart_type]} 个变量: {page_size}"
+            )
+        
+        columns = self.rank_variables(df, rank_by)
+        return ChartPages(self, df, chart_type, report_type, columns, page_size)
+    
+    def _get_figure_template(self,
+                             chart_type: str,
+                             nrows: int,
+                             ncols: int,
+                             figsize: Tuple[float, float],
+                             setup: Optional[Callable[[Figure, List[Any]], None]] = None) -> Dict[str, Any]:
+        """
+        获取图表模板
+        
+        相同图表类型和布局的模板只创建一次，子图、标题、字体、网格等静态元素
+        保留在模板中，复用时仅清除上一次绘制的数据元素。
+        
+        Args:
+            chart_type: 图表类型
+            nrows: 子图行数
+            ncols: 子图列数
+            figsize: 图表尺寸
+            setup: 模板首次创建时执行的静态元素设置函数
+        
+        Returns:
+            模板字典，包含 figure、axes 和 layout_ready
+        """
+        key = (chart_type, nrows, ncols, tuple(figsize))
+        template = self._figure_templates.get(key)
+        
+        if template is not None:
+            for ax in template["axes"]:
+                self._clear_data_artists(ax)
+            return template
+        
+        fig = Figure(figsize=figsize)
+        axes = list(fig.subplots(nrows, ncols, squeeze=False).flatten())
+        if setup:
+            setup(fig, axes)
+        
+        template = {"figure": fig, "axes": axes, "layout_ready": False}
+        if self.reuse_figures:
+            self._figure_templates[key] = template
+        
+        return template
+    
+    @staticmethod
+    def _clear_data_artists(ax):
+        """清除子图中的数据元素，保留坐标轴标签和样式"""
+        # 先移除容器（如 hist 的 BarContainer），容器会一并移除其中的元素，
+        # 否则容器会一直持有已移除的元素，批量生成报告时内存持续增长
+        for container in list(ax.containers):
+            container.remove()
+
+        for artist in [*ax.lines, *ax.patches, *ax.collections, *ax.images]:
+            artist.remove()
+        
+        legend = ax.get_legend()
+        if legend is not None:
+            legend.remove()
+        
+        ax.set_title('')
+        ax.set_visible(True)
+        
+        # 重置数据范围和坐标轴范围，未使用的子图与新建时一致，后续绘制时重新自动缩放
+        ax.relim()
+        ax.set_xlim(0, 1)
+        ax.set_ylim(0, 1)
+        ax.set_autoscale_on(True)
+    
+    def _save_figure_template(self, template: Dict[str, Any], chart_path: Path) -> str:
+        """保存模板图表，布局未变化时跳过 tight_layout 计算"""
+        fig = template["figure"]
+        
+        if not template["layout_ready"]:
+            fig.tight_layout()
+            template["layout_ready"] = True
+        
+        fig.savefig(chart_path, dpi=300, bbox_inches='tight')
+        
+        return str(chart_path)
+    
+    def clear_figure_templates(self):
+        """清空图表模板缓存"""
+        self._figure_templates.clear()
+    
     def _create_sample_distribution(self, df: pd.DataFrame, report_type: str) -> str:
         """创建样本分布图"""
-        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
-        fig.suptitle('样本分布分析', fontsize=16, fontweight='bold')
-        
-        # 数值变量分布
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        if len(numeric_cols) > 0:
-            for i, col in enumerate(numeric_cols[:4]):
-                ax = axes[i//2, i%2]
-                df[col].hist(bins=30, ax=ax, alpha=0.7, color=self.colors[i%len(self.colors)])
-                ax.set_title(f'{col} 分布')
+        def setup(fig, axes):
+            fig.suptitle('样本分布分析', fontsize=16, fontweight='bold')
+            for ax in axes:
                 ax.set_xlabel('值')
                 ax.set_ylabel('频数')
         
-        plt.tight_layout()
+        template = self._get_figure_template("sample_distribution", 2, 2, (16, 12), setup)
+        axes = template["axes"]
+        
+        # 数值变量分布，只计算绘制的前4个非空变量的分箱，不需要核密度曲线
+        numeric_df = df.select_dtypes(include=[np.number])
+        columns = list(numeric_df.columns[numeric_df.notna().any()])[:4]
+        densities = self.density_engine.compute(df, columns, kde=False)
+        for i, col in enumerate(densities):
+            ax = axes[i]
+            bin_edges = densities[col]["bin_edges"]
+            ax.hist(bin_edges[:-1], bins=bin_edges, weights=densities[col]["counts"],
+                   alpha=0.7, color=self.colors[i%len(self.colors)])
+            ax.grid(True)
+            ax.set_title(f'{col} 分布')
         
         chart_path = self.output_dir / f"sample_distribution_{report_type}.png"
-        plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-        plt.close()
         
-        return str(chart_path)
+        return self._save_figure_template(template, chart_path)
     
-    def _create_correlation_matrix(self, df: pd.DataFrame, report_type: str) -> str:
+    def _create_correlation_matrix(self, engine: DataEngine, report_type: str) -> str:
         """创建相关性矩阵"""
-        numeric_df = df.select_dtypes(include=[np.number])
-        if numeric_df.empty:
+        numeric_cols = engine.numeric_columns()
+        if len(numeric_cols) == 0:
             return ""
         
         plt.figure(figsize=(12, 10))
-        correlation_matrix = numeric_df.corr()
+        correlation_matrix = engine.corr(numeric_cols)
         
         mask = np.triu(np.ones_like(correlation_matrix, dtype=bool))
         
@@ -169,14 +426,18 @@ class ChartGenerator:
         
         return str(chart_path)
     
-    def _create_quality_score_distribution(self, df: pd.DataFrame, report_type: str) -> str:
+    def _create_quality_score_distribution(self, engine: DataEngine, report_type: str) -> str:
         """创建质量分数分布图"""
         # 计算质量分数（示例实现）
         quality_scores = []
         
-        for col in df.columns:
-            completeness = 1 - (df[col].isnull().sum() / len(df))
-            uniqueness = df[col].nunique() / len(df)
+        total_rows = engine.row_count()
+        null_counts = engine.null_counts()
+        unique_counts = engine.nunique(engine.columns())
+        
+        for col in engine.columns():
+            completeness = 1 - (null_counts[col] / total_rows)
+            uniqueness = unique_counts[col] / total_rows
             
             # 简单的质量评分
             quality_score = (completeness * 0.6 + uniqueness * 0.4) * 100
@@ -232,38 +493,43 @@ class ChartGenerator:
         n_cols = min(len(numeric_cols), 6)
         n_rows = (n_cols + 1) // 2
         
-        fig, axes = plt.subplots(n_rows, 2, figsize=(16, 4*n_rows))
-        axes = axes.flatten() if n_rows > 1 else [axes]
+        def setup(fig, axes):
+            fig.suptitle('变量分布分析', fontsize=16, fontweight='bold')
+            for ax in axes:
+                ax.set_xlabel('值')
+                ax.set_ylabel('密度')
+        
+        template = self._get_figure_template(
+            "variable_distribution", n_rows, 2, (16, 4*n_rows), setup
+        )
+        axes = template["axes"]
+        
+        densities = self.density_engine.compute(df, list(numeric_cols[:n_cols]))
         
         for i, col in enumerate(numeric_cols[:n_cols]):
             ax = axes[i]
+            density = densities.get(col)
+            if density is None:
+                continue
             
             # 创建直方图和核密度估计
-            ax.hist(df[col], bins=30, alpha=0.7, density=True, 
-                   color=self.colors[i%len(self.colors)])
+            bin_edges = density["bin_edges"]
+            ax.hist(bin_edges[:-1], bins=bin_edges, weights=density["density"],
+                   alpha=0.7, color=self.colors[i%len(self.colors)])
             
-            # 添加核密度曲线
-            try:
-                sns.kdeplot(data=df[col], ax=ax, color='red', linewidth=2)
-            except:
-                pass
+            # 添加核密度曲线（常数列或样本不足时无法估计）
+            if density["kde_x"] is not None:
+                ax.plot(density["kde_x"], density["kde_y"], color='red', linewidth=2)
             
             ax.set_title(f'{col} 分布')
-            ax.set_xlabel('值')
-            ax.set_ylabel('密度')
         
         # 隐藏多余的子图
         for i in range(n_cols, len(axes)):
-            fig.delaxes(axes[i])
-        
-        plt.suptitle('变量分布分析', fontsize=16, fontweight='bold')
-        plt.tight_layout()
+            axes[i].set_visible(False)
         
         chart_path = self.output_dir / f"variable_distribution_{report_type}.png"
-        plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-        plt.close()
         
-        return str(chart_path)
+        return self._save_figure_template(template, chart_path)
     
     def _create_outlier_detection(self, df: pd.DataFrame, report_type: str) -> str:
         """创建异常值检测图"""
@@ -272,8 +538,15 @@ class ChartGenerator:
             return ""
         
         n_cols = min(len(numeric_cols), 4)
-        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
-        axes = axes.flatten()
+        
+        def setup(fig, axes):
+            fig.suptitle('异常值检测分析', fontsize=16, fontweight='bold')
+            for ax in axes:
+                ax.set_ylabel('值')
+                ax.grid(True, alpha=0.3)
+        
+        template = self._get_figure_template("outlier_detection", 2, 2, (16, 12), setup)
+        axes = template["axes"]
         
         for i, col in enumerate(numeric_cols[:n_cols]):
             ax = axes[i]
@@ -287,26 +560,19 @@ class ChartGenerator:
                 patch.set_alpha(0.7)
             
             ax.set_title(f'{col} 异常值检测')
-            ax.set_ylabel('值')
-            ax.grid(True, alpha=0.3)
         
         # 隐藏多余的子图
         for i in range(n_cols, len(axes)):
-            fig.delaxes(axes[i])
-        
-        plt.suptitle('异常值检测分析', fontsize=16, fontweight='bold')
-        plt.tight_layout()
+            axes[i].set_visible(False)
         
         chart_path = self.output_dir / f"outlier_detection_{report_type}.png"
-        plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-        plt.close()
         
-        return str(chart_path)
+        return self._save_figure_template(template, chart_path)
     
     def _create_trend_analysis(self, df: pd.DataFrame, report_type: str) -> str:
         """创建趋势分析图"""
         # 假设有日期列
-        date_cols = [col for col in df.columns if 'date' in col.lower() or 'time' in col.lower()]
+        date_cols = self._date_columns(df)
         
         if not date_cols:
             # 如果没有日期列，使用索引作为时间轴
@@ -363,6 +629,11 @@ class ChartGenerator:
         
         return str(chart_path)
     
+    @staticmethod
+    def _date_columns(df: pd.DataFrame) -> List[str]:
+        """按列名识别日期列"""
+        return [col for col in df.columns if 'date' in str(col).lower() or 'time' in str(col).lower()]
+    
     def _create_box_plot(self, df: pd.DataFrame, report_type: str) -> str:
         """创建箱线图"""
         numeric_cols = df.select_dtypes(include=[np.number]).columns
@@ -373,7 +644,7 @@ class ChartGenerator:
         
         # 创建箱线图
         box_data = [df[col].dropna() for col in numeric_cols]
-        box_plot = plt.boxplot(box_data, labels=numeric_cols, patch_artist=True)
+        box_plot = plt.boxplot(box_data, patch_artist=True)
         
         # 设置颜色
         colors = [self.colors[i%len(self.colors)] for i in range(len(numeric_cols))]
@@ -384,7 +655,7 @@ class ChartGenerator:
         plt.title('变量箱线图分析', fontsize=16, fontweight='bold')
         plt.xlabel('变量')
         plt.ylabel('值')
-        plt.xticks(rotation=45, ha='right')
+        plt.xticks(range(1, len(numeric_cols) + 1), numeric_cols, rotation=45, ha='right')
         plt.grid(True, alpha=0.3)
         plt.tight_layout()
         
@@ -428,9 +699,9 @@ class ChartGenerator:
         """创建时间序列图"""
         return self._create_trend_analysis(df, report_type)
     
-    def _create_stacked_bar(self, df: pd.DataFrame, report_type: str) -> str:
+    def _create_stacked_bar(self, engine: DataEngine, report_type: str) -> str:
         """创建堆叠柱状图"""
-        categorical_cols = df.select_dtypes(include=['object']).columns
+        categorical_cols = engine.categorical_columns()
         
         if len(categorical_cols) < 2:
             return ""
@@ -439,7 +710,7 @@ class ChartGenerator:
         cat_col2 = categorical_cols[1]
         
         # 创建交叉表
-        cross_tab = pd.crosstab(df[cat_col1], df[cat_col2])
+        cross_tab = engine.crosstab(cat_col1, cat_col2)
         
         plt.figure(figsize=(14, 8))
         cross_tab.plot(kind='bar', stacked=True, color=self.colors[:len(cross_tab.columns)])
@@ -485,6 +756,23 @@ class ChartGenerator:
         
         return str(chart_path)
     
+    def export_density_data(self, df: pd.DataFrame, report_type: str) -> str:
+        """
+        导出分布图表使用的分箱和密度数据
+        
+        Args:
+            df: 数据DataFrame
+            report_type: 报告类型
+            
+        Returns:
+            JSON文件路径
+        """
+        data_path = self.output_dir / f"density_data_{report_type}.json"
+        with open(data_path, 'w', encoding='utf-8') as f:
+            json.dump(self.density_engine.export_densities(df), f, ensure_ascii=False)
+        
+        return str(data_path)
+    
     def chart_to_base64(self, chart_path: str) -> str:
         """将图表转换为base64编码"""
         with open(chart_path, 'rb') as f:
@@ -493,4 +781,134 @@ class ChartGenerator:
     def cleanup_charts(self):
         """清理生成的图表文件"""
         for file in self.output_dir.glob("*.png"):
-            file.unlink()
\ No newline at end of file
+            file.unlink()
+
+
+class ChartPages:
+    """
+    分页图表集合
+    持有排序后的变量分页，页面在首次访问时才渲染，已渲染页面的路径会被缓存
+    """
+    
+    def __init__(self,
+                 generator: ChartGenerator,
+                 df: pd.DataFrame,
+                 chart_type: str,
+                 report_type: str,
+                 columns: List[str],
+                 page_size: int):
+        """
+        初始化分页图表集合
+        
+        Args:
+            generator: 图表生成器
+            df: 数据DataFrame
+            chart_type: 图表类型
+            report_type: 报告类型
+            columns: 排序后的数值变量列表
+            page_size: 每页变量数
+        """
+        if page_size < 1:
+            raise ValueError("每页变量数必须大于0")
+        
+        self.generator = generator
+        self.df = df
+        self.chart_type = chart_type
+        self.report_type = report_type
+        self.pages = [columns[i:i + page_size] for i in range(0, len(columns), page_size)]
+        self._paths: Dict[int, str] = {}
+    
+    def __len__(self) -> int:
+        return len(self.pages)
+    
+    def page_columns(self, page: int) -> List[str]:
+        """获取指定页的变量列表"""
+        return self.pages[page]
+    
+    def render(self, page: int) -> str:
+        """
+        渲染指定页
+        
+        Args:
+            page: 页码（从0开始）
+            
+        Returns:
+            图表路径
+        """
+        if page not in self._paths:
+            self._paths[page] = self.generator._generate_chart(
+                self._page_frame(page), self.chart_type, self._page_report_type(page)
+            )
+        
+        return self._paths[page]
+    
+    def render_pages(self,
+                     pages: Optional[List[int]] = None,
+                     max_workers: Optional[int] = None) -> Dict[int, str]:
+        """
+        并行渲染多页
+        
+        pyplot 不是线程安全的，因此使用多进程渲染。每个进程按当前生成器的配置创建一个生成器，
+        渲染分配到的所有页时复用同一组图表模板，每页只传送本页需要的列
+        
+        Args:
+            pages: 页码列表，默认渲染全部页
+            max_workers: 最大进程数，为1时在当前进程中依次渲染
+            
+        Returns:
+            页码到图表路径的字典
+        """
+        if pages is None:
+            pages = list(range(len(self.pages)))
+        
+        pending = [page for page in pages if page not in self._paths]
+        
+        if len(pending) <= 1 or max_workers == 1:
+            for page in pending:
+                self.render(page)
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers,
+                                     initializer=_init_page_worker,
+                                     initargs=(self.generator.config(),)) as executor:
+                futures = {
+                    page: executor.submit(
+                        _render_chart_page,
+                        self.chart_type,
+                        self._page_report_type(page),
+                        self._page_frame(page)
+                    )
+                    for page in pending
+                }
+                for page, future in futures.items():
+                    self._paths[page] = future.result()
+        
+        return {page: self._paths[page] for page in pages}
+    
+    def _page_frame(self, page: int) -> pd.DataFrame:
+        """构造指定页的数据，只有趋势类图表保留非数值的日期列"""
+        keep = []
+        if self.chart_type in ChartGenerator.DATE_AXIS_CHARTS:
+            numeric_cols = set(self.df.select_dtypes(include=[np.number]).columns)
+            keep = [col for col in ChartGenerator._date_columns(self.df) if col not in numeric_cols]
+        
+        # 按排序结果排列当页变量
+        return self.df[keep + self.pages[page]]
+    
+    def _page_report_type(self, page: int) -> str:
+        """生成分页图表文件名中的报告类型部分"""
+        return f"{self.report_type}_page{page + 1}"
+
+
+# 子进程中复用的图表生成器，由 _init_page_worker 创建
+_page_generator: Optional[ChartGenerator] = None
+
+
+def _init_page_worker(config: Dict[str, Any]):
+    """子进程初始化，按主进程生成器的配置创建本进程共用的生成器"""
+    global _page_generator
+    _page_generator = ChartGenerator.from_config(config)
+
+
+def _render_chart_page(chart_type: str, report_type: str, df: pd.DataFrame) -> str:
+    """在子进程中渲染单页图表"""
+    return _page_generator._generate_chart(df, chart_type, report_type)